@@ -33,18 +33,130 @@ Examples:
 GET /books/?category=math&author=Jane%20Doe&page=2&limit=10
 """
 
-from fastapi import FastAPI, Body, Query
+import threading
+from functools import lru_cache
+from typing import NamedTuple
+from uuid import uuid4
+
+import orjson
+from fastapi import FastAPI, Body, HTTPException, Query, Request, Response
 
 app = FastAPI()
 
-BOOKS: list[dict[str, str]] = [
+
+@lru_cache(maxsize=4096)
+def _cf(value: str) -> str:
+    # One casefold per distinct string: repeated authors/categories/titles reuse
+    # the same cached (and shared) key for the index lookups
+    return value.casefold()
+
+
+def _with_cf(book: dict[str, str]) -> dict[str, str]:
+    # The indexes need these three fields, so reject the body before anything is stored
+    if not isinstance(book, dict) or not all(
+        isinstance(book.get(field), str) for field in ("title", "author", "category")
+    ):
+        raise HTTPException(status_code=422, detail="A book needs a title, author and category.")
+    # Casefold the lookup fields once on insert, so requests only casefold their input
+    return {
+        **book,
+        "_author_cf": _cf(book["author"]),
+        "_category_cf": _cf(book["category"]),
+        "_title_cf": _cf(book["title"]),
+    }
+
+
+def _public(book: dict[str, str]) -> dict[str, str]:
+    # Strip the cached "_..._cf" keys so the JSON payload stays the same.
+    # Only called in _publish_books: readers return the projections built there
+    return {key: value for key, value in book.items() if not key.startswith("_")}
+
+
+# The current list of books: every write rebinds it in _publish_books. Endpoints read
+# `_state` instead, which holds this same list together with its indexes
+BOOKS: list[dict[str, str]] = [_with_cf(book) for book in [
     {"title": "Title One", "author": "Author One", "category": "science"},
     {"title": "Title Two", "author": "Author Two", "category": "science"},
     {"title": "Title Three", "author": "Author Three", "category": "history"},
     {"title": "Title Four", "author": "Author Four", "category": "math"},
     {"title": "Title Five", "author": "Author Five", "category": "math"},
     {"title": "Title Six", "author": "Author Two", "category": "math"},
-]
+]]
+
+
+class _Snapshot(NamedTuple):
+    # Everything readers need, published as one object so a request that reads
+    # `_state` once never mixes data from two different writes
+    books: list[dict[str, str]]
+    # The same books without the "_..._cf" keys, position for position
+    public_books: list[dict[str, str]]
+    # Secondary indexes keyed by the casefolded field value, so lookups are a single
+    # dict hit instead of a scan over the books. They hold the public dicts, so
+    # readers return them as they are
+    by_category: dict[str, list[dict[str, str]]]
+    by_author: dict[str, list[dict[str, str]]]
+    by_title: dict[str, list[dict[str, str]]]
+    by_author_category: dict[tuple[str, str], list[dict[str, str]]]
+    # ETag of the unfiltered list and the count, with both bodies pre-encoded
+    etag: str
+    all_books_json: bytes
+    count_json: bytes
+
+
+# Every write bumps _version, which goes into the ETag.
+# The per-process prefix keeps a restarted server from matching an old client's ETag.
+_version = 0
+_etag_prefix = uuid4().hex[:8]
+
+# Writers are serialized by this lock and never mutate a snapshot in place: they build
+# a new one and swap `_state` (copy-on-write). Rebinding one global is atomic, so readers
+# need no lock as long as they read `_state` once per request.
+# Writers are plain `def` endpoints running in the threadpool, hence a threading lock.
+_books_lock = threading.Lock()
+_state: _Snapshot
+
+
+def _publish_books(books: list[dict[str, str]]) -> None:
+    global BOOKS, _state, _version
+    by_category: dict[str, list[dict[str, str]]] = {}
+    by_author: dict[str, list[dict[str, str]]] = {}
+    by_title: dict[str, list[dict[str, str]]] = {}
+    by_author_category: dict[tuple[str, str], list[dict[str, str]]] = {}
+    public_books = [_public(book) for book in books]
+    for book, public in zip(books, public_books):
+        by_category.setdefault(book["_category_cf"], []).append(public)
+        by_author.setdefault(book["_author_cf"], []).append(public)
+        by_title.setdefault(book["_title_cf"], []).append(public)
+        by_author_category.setdefault(
+            (book["_author_cf"], book["_category_cf"]), []
+        ).append(public)
+    _version += 1
+    _state = _Snapshot(
+        books,
+        public_books,
+        by_category,
+        by_author,
+        by_title,
+        by_author_category,
+        f'"{_etag_prefix}-{_version}"',
+        orjson.dumps(public_books),
+        orjson.dumps({"count": len(books)}),
+    )
+    BOOKS = books
+
+
+def _cached_response(request: Request, etag: str, content: bytes) -> Response:
+    # A client that already has this version gets an empty 304 instead of the body.
+    # If-None-Match can list several tags, and a proxy that compresses the body hands
+    # out a weak W/"..." copy of ours, so compare each tag without the W/ prefix.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
+
+
+_publish_books(BOOKS)
 
 
 # First simple example
@@ -59,43 +171,37 @@ BOOKS: list[dict[str, str]] = [
 # 1. LIST (with optional "category" filter)
 # Query parameter - "category"
 @app.get("/books/", response_model=list[dict[str, str]])
-async def get_all_book(category: str | None = Query(None)):
+async def get_all_book(request: Request, category: str | None = Query(None)):
     if category:
-        books_with_category: list[dict[str, str]] = []
-        for book in BOOKS:
-            if book.get("category").casefold() == category.casefold():
-                books_with_category.append(book)
-        return books_with_category
+        return _state.by_category.get(_cf(category), [])
 
-    return BOOKS
+    state = _state
+    return _cached_response(request, state.etag, state.all_books_json)
 
 
 # 2. SPECIFIC STATIC (specific static "count" after root "books")
 # No parameters
 @app.get("/books/count")
-async def count_books():
-    return {"count": len(BOOKS)}
+async def count_books(request: Request):
+    state = _state
+    return _cached_response(request, state.etag, state.count_json)
 
 
 # 3. SPECIFIC DYNAMIC (after specific static "by_author" comes dynamic "author")
 # Dynamic parameter - "author"
-@app.get("/books/by_author/{author}")
+@app.get("/books/by_author/{author}", response_model=list[dict[str, str]])
 async def get_books_by_author(author: str):
-    books_by_author: list[dict[str, str]] = []
-    for book in BOOKS:
-        if book.get("author").casefold() == author.casefold():
-            books_by_author.append(book)
-    return books_by_author    
+    return _state.by_author.get(_cf(author), [])
 
 
 # 4. GENERIC DYNAMIC (dynamic after root "books")
 # Dynamic parameter - "title"
-@app.get("/books/{book_title}")
+@app.get("/books/{book_title}", response_model=dict[str, str] | None)
 async def get_books_by_title(book_title: str):
-    for book in BOOKS:
-        if book.get("title").casefold() == book_title.casefold():
-            return book
-        
+    books = _state.by_title.get(_cf(book_title))
+    if books:
+        return books[0]
+
 
 # Path dynamic and query parameters example
 # Change root to "author" to not have a conflict with "/book/{book_title}"
@@ -103,32 +209,40 @@ async def get_books_by_title(book_title: str):
 async def read_author_category_by_query(
     author: str, category: str
 ) -> list[dict[str, str]]:
-    books_to_return: list[dict[str, str]] = []
-    for book in BOOKS:
-        if (
-            book.get("author").casefold() == author.casefold()
-            and book.get("category").casefold() == category.casefold()
-        ):
-            books_to_return.append(book)
-    return books_to_return
+    return _state.by_author_category.get((_cf(author), _cf(category)), [])
 
 
 # 5. Mutations (POST/PUT/DELETE)
+# Writes copy the book list and rebuild the indexes, which is O(N) CPU work with nothing to await.
+# Declared with `def` so FastAPI runs them in its threadpool instead of blocking the event loop.
+# The reads above stay `async def`: they are index lookups and return right away.
 @app.post("/books/create_book")
-async def create_book(new_book=Body()):
-    BOOKS.append(new_book)
+def create_book(new_book=Body()):
+    new_book = _with_cf(new_book)
+    with _books_lock:
+        _publish_books([*_state.books, new_book])
 
 
 @app.put("/books/update_book")
-async def update_book(updated_book: dict[str, str] = Body()):
-    for i in range(len(BOOKS)):
-        if BOOKS[i].get("title").casefold() == updated_book.get("title").casefold():
-            BOOKS[i] = updated_book
+def update_book(updated_book: dict[str, str] = Body()):
+    updated_book = _with_cf(updated_book)
+    title_cf = updated_book["_title_cf"]
+    with _books_lock:
+        state = _state
+        if title_cf in state.by_title:
+            _publish_books(
+                [updated_book if book["_title_cf"] == title_cf else book for book in state.books]
+            )
 
 
 @app.delete("/books/delete_book/{book_title}")
-async def delete_book(book_title: str):
-    for i in range(len(BOOKS)):
-        if BOOKS[i].get("title").casefold() == book_title.casefold():
-            BOOKS.pop(i)
-            break
+def delete_book(book_title: str):
+    title_cf = _cf(book_title)
+    with _books_lock:
+        state = _state
+        books = state.by_title.get(title_cf)
+        if books:
+            # The title index gives the first match directly, no casefold comparison per book.
+            # public_books is parallel to books, so its position is the one to drop
+            i = state.public_books.index(books[0])
+            _publish_books(state.books[:i] + state.books[i + 1:])
@@ -0,0 +1,78 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# project2 has a books.py too, so load this one under its own module name
+# instead of `import books`, which would return whichever was imported first
+_spec = importlib.util.spec_from_file_location("project1_books", Path(__file__).with_name("books.py"))
+books = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(books)
+
+
+SEED = [
+    {"title": "Title One", "author": "Author One", "category": "science"},
+    {"title": "Title Two", "author": "Author Two", "category": "science"},
+    {"title": "Title Three", "author": "Author Two", "category": "math"},
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Every test publishes its own books; monkeypatch puts the module state back afterwards
+    monkeypatch.setattr(books, "BOOKS", books.BOOKS)
+    monkeypatch.setattr(books, "_state", books._state)
+    monkeypatch.setattr(books, "_version", books._version)
+    books._publish_books([books._with_cf(book) for book in SEED])
+    return TestClient(books.app)
+
+
+def titles(response) -> list[str]:
+    return [book["title"] for book in response.json()]
+
+
+def test_lookups_ignore_case(client):
+    assert titles(client.get("/books/", params={"category": "SCIENCE"})) == ["Title One", "Title Two"]
+    assert titles(client.get("/books/by_author/author two")) == ["Title Two", "Title Three"]
+    assert client.get("/books/title THREE").json() == SEED[2]
+    assert titles(client.get("/author/AUTHOR TWO/", params={"category": "Math"})) == ["Title Three"]
+
+
+def test_writes_keep_order_and_hide_cached_keys(client):
+    new_book = {"title": "Title Four", "author": "Author One", "category": "math"}
+    assert client.post("/books/create_book", json=new_book).status_code == 200
+    updated = {"title": "title two", "author": "Author Five", "category": "history"}
+    assert client.put("/books/update_book", json=updated).status_code == 200
+    assert client.delete("/books/delete_book/TITLE ONE").status_code == 200
+
+    assert client.get("/books/").json() == [updated, SEED[2], new_book]
+    assert client.get("/books/by_author/author one").json() == [new_book]
+    assert client.get("/books/", params={"category": "math"}).json() == [SEED[2], new_book]
+    assert client.get("/books/title two").json() == updated
+    assert client.get("/books/count").json() == {"count": 3}
+    # The module keeps BOOKS on the published list
+    assert books.BOOKS is books._state.books
+
+
+def test_invalid_body_is_rejected(client):
+    state = books._state
+    response = client.post("/books/create_book", json={"title": "No author"})
+    assert response.status_code == 422
+    response = client.put("/books/update_book", json={"title": "Title One"})
+    assert response.status_code == 422
+    assert books._state is state
+
+
+def test_etag(client):
+    etag = client.get("/books/").headers["etag"]
+    assert client.get("/books/count").headers["etag"] == etag
+    for path in ("/books/", "/books/count"):
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    client.delete("/books/delete_book/Title One")
+    response = client.get("/books/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert titles(response) == ["Title Two", "Title Three"]
+    assert client.get("/books/count", headers={"If-None-Match": etag}).json() == {"count": 2}
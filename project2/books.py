@@ -1,12 +1,51 @@
-from fastapi import FastAPI, Path, Query, HTTPException
-from pydantic import BaseModel, Field
+from array import array
+from bisect import bisect_left, insort
+from operator import attrgetter
+from uuid import uuid4
+
+from fastapi import FastAPI, Path, Query, HTTPException, Request, Response
+from pydantic import BaseModel, Field, TypeAdapter
 from starlette import status
 
+# Optional: numpy and numba only speed up the rating range scan on large catalogs,
+# the plain Python scan works without them
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    _match_rating = None
+else:
+    @njit(cache=True)
+    def _match_rating(ratings, min_rating, max_rating):
+        # Indices of the books rated within the range, compiled to native code by numba
+        out = np.empty(ratings.shape[0], np.int64)
+        n = 0
+        for i in range(ratings.shape[0]):
+            if min_rating <= ratings[i] <= max_rating:
+                out[n] = i
+                n += 1
+        return out[:n]
+
+    # Compile at import (or load it from numba's on-disk cache), not on the first large
+    # request: that request would otherwise block the event loop while numba compiles
+    _match_rating(np.zeros(1, np.int8), 0, 0)
+
+
+# Below this many books calling into numpy/numba for the rating column scan costs more
+# than a plain Python scan
+_VECTORIZE_MIN_BOOKS = 1000
+
 
 app = FastAPI()
 
 
-class Book:
+class Book(BaseModel):
+    # A single Pydantic model for stored books and for responses: FastAPI
+    # serializes it from its schema, no __dict__ reflection or copy into another type
     id: int
     title: str
     author: str
@@ -14,14 +53,21 @@ class Book:
     rating: int
     published_year: int
 
+    # Books are only built from already validated data, so don't re-validate on assignment
+    model_config = {"validate_assignment": False}
 
-    def __init__(self, id: int, title: str, author: str, description: str, rating: int, published_year: int):
-        self.id = id
-        self.title = title
-        self.author = author
-        self.description = description
-        self.rating = rating
-        self.published_year = published_year
+    @classmethod
+    def from_request(cls, book_request: "BookRequest") -> "Book":
+        # BookRequest already validated these fields: model_construct() skips a second
+        # validation pass and there is no intermediate model_dump() dict
+        return cls.model_construct(
+            id=book_request.id,
+            title=book_request.title,
+            author=book_request.author,
+            description=book_request.description,
+            rating=book_request.rating,
+            published_year=book_request.published_year,
+        )
 
 
 class BookRequest(BaseModel):
@@ -45,69 +91,220 @@ class BookRequest(BaseModel):
     }
 
 
-def find_book_id(book: Book):
-    if len(BOOKS) > 0:
-        book.id = BOOKS[-1].id + 1
-    else: 
-        book.id = 1
+_book_id = attrgetter("id")
 
-    return book
 
+class BookRepo:
+    """
+    In-memory store for the books, kept in insertion (id) order.
+
+    An exact rating is a lookup in a per-rating bucket. Next to the Book objects
+    every rating is also kept in a packed array.array column (struct of arrays),
+    so a rating range scans one byte per book instead of loading each Book just
+    to read one attribute.
+    """
+
+    def __init__(self, books: list[Book]):
+        self.books: list[Book] = []
+        self.ratings = array("b")
+        # Position of each book in self.books by id, so id lookups don't scan the list
+        self._id_to_index: dict[int, int] = {}
+        # Books with each rating, in id order like self.books
+        self._by_rating: dict[int, list[Book]] = {}
+        # Books sorted by (published year, id), with those keys in a parallel list so
+        # bisect can find any year or year range in O(log N), in id order within a year
+        self._year_keys: list[tuple[int, int]] = []
+        self._books_by_year: list[Book] = []
+        for book in books:
+            self.add(book)
+
+    def __iter__(self):
+        return iter(self.books)
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def get(self, book_id: int) -> Book | None:
+        idx = self._id_to_index.get(book_id)
+        if idx is None:
+            return None
+        return self.books[idx]
+
+    def add(self, book: Book) -> None:
+        self._id_to_index[book.id] = len(self.books)
+        self.books.append(book)
+        self.ratings.append(book.rating)
+        insort(self._by_rating.setdefault(book.rating, []), book, key=_book_id)
+        self._insert_by_year(book)
+
+    def replace(self, book: Book) -> bool:
+        idx = self._id_to_index.get(book.id)
+        if idx is None:
+            return False
+        self._remove_by_rating(self.books[idx])
+        self._remove_by_year(self.books[idx])
+        self.books[idx] = book
+        self.ratings[idx] = book.rating
+        insort(self._by_rating.setdefault(book.rating, []), book, key=_book_id)
+        self._insert_by_year(book)
+        return True
+
+    def remove(self, book_id: int) -> bool:
+        idx = self._id_to_index.pop(book_id, None)
+        if idx is None:
+            return False
+        # Delete in place so listings keep their insertion (id) order
+        deleted = self.books[idx]
+        del self.books[idx]
+        del self.ratings[idx]
+        # Every later book moved down one slot, so their positions move too
+        for i in range(idx, len(self.books)):
+            self._id_to_index[self.books[i].id] = i
+        self._remove_by_rating(deleted)
+        self._remove_by_year(deleted)
+        return True
+
+    def with_rating(self, rating: int) -> list[Book]:
+        return list(self._by_rating.get(rating, ()))
+
+    def rated_between(self, min_rating: int, max_rating: int) -> list[Book]:
+        books = self.books
+        if np is not None and len(books) >= _VECTORIZE_MIN_BOOKS:
+            # Zero-copy int8 view of the packed column, only alive for this call
+            ratings = np.frombuffer(self.ratings, dtype=np.int8)
+            if _match_rating is not None:
+                idx = _match_rating(ratings, min_rating, max_rating)
+            else:
+                idx = np.flatnonzero((ratings >= min_rating) & (ratings <= max_rating))
+            return [books[i] for i in idx.tolist()]
+        return [
+            books[i]
+            for i, rating in enumerate(self.ratings)
+            if min_rating <= rating <= max_rating
+        ]
 
-BOOKS: list[Book] = [
-    Book(1, "Book1", "Author1", "Description1", 5, 2001),
-    Book(2, "Book2", "Author2", "Description2", 4, 2001),
-    Book(3, "Book3", "Author3", "Description3", 3, 2002),
-    Book(4, "Book4", "Author4", "Description4", 5, 2002),
-    Book(5, "Book5", "Author5", "Description5", 2, 2001),
-    Book(6, "Book6", "Author6", "Description6", 1, 2002),
-]
+    def published_between(self, year_from: int, year_to: int) -> list[Book]:
+        lo = bisect_left(self._year_keys, (year_from,))
+        hi = bisect_left(self._year_keys, (year_to + 1,))
+        return self._books_by_year[lo:hi]
 
+    def _remove_by_rating(self, book: Book) -> None:
+        bucket = self._by_rating[book.rating]
+        del bucket[bisect_left(bucket, book.id, key=_book_id)]
+        if not bucket:
+            del self._by_rating[book.rating]
 
-@app.get("/books/all_books", status_code=status.HTTP_200_OK)
-async def get_all_books():
+    def _insert_by_year(self, book: Book) -> None:
+        key = (book.published_year, book.id)
+        i = bisect_left(self._year_keys, key)
+        self._year_keys.insert(i, key)
+        self._books_by_year.insert(i, book)
+
+    def _remove_by_year(self, book: Book) -> None:
+        i = bisect_left(self._year_keys, (book.published_year, book.id))
+        del self._year_keys[i]
+        del self._books_by_year[i]
+
+
+BOOKS = BookRepo([
+    Book(id=1, title="Book1", author="Author1", description="Description1", rating=5, published_year=2001),
+    Book(id=2, title="Book2", author="Author2", description="Description2", rating=4, published_year=2001),
+    Book(id=3, title="Book3", author="Author3", description="Description3", rating=3, published_year=2002),
+    Book(id=4, title="Book4", author="Author4", description="Description4", rating=5, published_year=2002),
+    Book(id=5, title="Book5", author="Author5", description="Description5", rating=2, published_year=2001),
+    Book(id=6, title="Book6", author="Author6", description="Description6", rating=1, published_year=2002),
+])
+
+# Ids come from a counter, so they never depend on the order of BOOKS
+# and a deleted id is never handed out again
+_next_id: int = max((book.id for book in BOOKS), default=0) + 1
+
+# ETag of /books/all_books: per-process prefix plus a write counter
+_version = 0
+_etag_prefix = uuid4().hex[:8]
+
+# Serialized /books/all_books body, dropped on every write and rebuilt on the next read
+_all_books_json: bytes | None = None
+# Dumps a whole list of books to JSON bytes in pydantic-core, no Python-level encoding
+_books_adapter = TypeAdapter(list[Book])
+
+
+def _books_changed() -> None:
+    # Every write ends here: drop the cached body and move the ETag on
+    global _all_books_json, _version
+    _all_books_json = None
+    _version += 1
+
+
+def _cached_response(request: Request, etag: str, content: bytes) -> Response:
+    # 304 when any If-None-Match tag (weak W/ prefix ignored) is the current ETag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
+
+
+@app.get("/books/all_books", status_code=status.HTTP_200_OK, response_model=list[Book])
+async def get_all_books(request: Request):
     """
-    When you return a Python object (or a list of them), 
-    FastAPI uses its JSONableEncoder to turn it into JSON.
+    Returning Book models (or a list of them) would let FastAPI serialize
+    them itself, through the response_model schema in pydantic-core.
 
-    For plain classes, it takes their .__dict__ (attribute dict) 
-    and makes JSON objects (i.e. Python dicts) out of them.
+    This route skips that step: the list only changes on writes, so the whole
+    list is dumped to JSON bytes once with a TypeAdapter, and those cached bytes
+    are returned in a plain Response until the next create/update/delete.
+    The response_model is still declared so the OpenAPI docs show the schema.
 
-    Result: your browser or client sees a JSON array of objects 
-    (each object is a dict of id, title, etc.), not literal Book(...) instances.
+    A client sending the current ETag in If-None-Match gets an empty 304.
     """
-    return BOOKS
+    global _all_books_json
+    if _all_books_json is None:
+        _all_books_json = _books_adapter.dump_json(BOOKS.books)
+    return _cached_response(request, f'"{_etag_prefix}-{_version}"', _all_books_json)
 
 
-@app.get("/books/", status_code=status.HTTP_200_OK)
+@app.get("/books/", status_code=status.HTTP_200_OK, response_model=list[Book])
 async def read_book_by_rating(book_rating: int = Query(ge=0, le=5)):
-    books_with_target_rating: list[Book] = []
-    for book in BOOKS:
-        if book.rating == book_rating:
-            books_with_target_rating.append(book)
-    return books_with_target_rating
+    return BOOKS.with_rating(book_rating)
+
+
+@app.get("/books/rating_range/", status_code=status.HTTP_200_OK, response_model=list[Book])
+async def read_books_by_rating_range(
+    min_rating: int = Query(ge=0, le=5), max_rating: int = Query(ge=0, le=5)
+):
+    if min_rating > max_rating:
+        raise HTTPException(status_code=422, detail="min_rating must not be greater than max_rating.")
+    return BOOKS.rated_between(min_rating, max_rating)
 
 
-@app.get("/books/year_filer/", status_code=status.HTTP_200_OK)
+@app.get("/books/year_filer/", status_code=status.HTTP_200_OK, response_model=list[Book])
 async def read_book_by_published_year(published_year: int = Query(ge=1000, le=2100)):
-    books_with_target_publish_year: list[Book] = []
-    for book in BOOKS:
-        if book.published_year == published_year:
-            books_with_target_publish_year.append(book)
-    return books_with_target_publish_year
+    return BOOKS.published_between(published_year, published_year)
 
 
-@app.get("/books/{book_id}", status_code=status.HTTP_200_OK)
+@app.get("/books/year_range/", status_code=status.HTTP_200_OK, response_model=list[Book])
+async def read_books_by_year_range(
+    year_from: int = Query(ge=1000, le=2100), year_to: int = Query(ge=1000, le=2100)
+):
+    if year_from > year_to:
+        raise HTTPException(status_code=422, detail="year_from must not be greater than year_to.")
+    return BOOKS.published_between(year_from, year_to)
+
+
+@app.get("/books/{book_id}", status_code=status.HTTP_200_OK, response_model=Book)
 async def read_book_by_id(book_id: int = Path(gt=0)):
-    for book in BOOKS:
-        if book.id == book_id:
-            return book
-    raise HTTPException(status_code=404, detail="Item not found")
+    book = BOOKS.get(book_id)
+    if book is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return book
 
 
 @app.post("/create_book/", status_code=status.HTTP_201_CREATED)
 async def create_book(book_request: BookRequest):
-    # book_request.model_dump() returns a Python dict:
+    global _next_id
+    # Book(**book_request.model_dump()) would work too:
+    # model_dump() returns a Python dict
     # {
     #     "id": None,
     #     "title": "My New Title",
@@ -115,40 +312,24 @@ async def create_book(book_request: BookRequest):
     #     "description": "…",
     #     "rating": 4
     # }
-    # Book(**that_dict)
-    # 
-    # The ** operator unpacks the dict into keyword arguments.
-    # It's equivalent to:
-    # Book(
-    #     id=that_dict["id"],
-    #     title=that_dict["title"],
-    #     author=that_dict["author"],
-    #     description=that_dict["description"],
-    #     rating=that_dict["rating"],
-    # )
-    new_book = Book(**book_request.model_dump())
-    BOOKS.append(find_book_id(new_book))
+    # and the ** operator unpacks it into keyword arguments.
+    # Book.from_request() reads the attributes directly and skips that dict.
+    new_book = Book.from_request(book_request)
+    new_book.id = _next_id
+    _next_id += 1
+    BOOKS.add(new_book)
+    _books_changed()
 
 
 @app.put("/books/update_book/", status_code=status.HTTP_204_NO_CONTENT)
 async def update_book(book_request: BookRequest):
-    is_book_changed = False
-    for i in range(len(BOOKS)):
-        if BOOKS[i].id == book_request.id:
-            BOOKS[i] = Book(**book_request.model_dump())
-            is_book_changed = True
-            break
-    if not is_book_changed:
+    if not BOOKS.replace(Book.from_request(book_request)):
         raise HTTPException(status_code=404, detail="Item not found.")
+    _books_changed()
 
 
 @app.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(book_id: int = Path(gt=0)):
-    is_book_changed = False
-    for i in range(len(BOOKS)):
-        if BOOKS[i].id == book_id:
-            BOOKS.pop(i)
-            is_book_changed = True
-            break
-    if not is_book_changed:
-        raise HTTPException(status_code=404, detail="Item not found.")
\ No newline at end of file
+    if not BOOKS.remove(book_id):
+        raise HTTPException(status_code=404, detail="Item not found.")
+    _books_changed()
@@ -0,0 +1,107 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import books
+from books import Book, BookRepo
+
+
+def make_book(id: int, rating: int = 3, published_year: int = 2001) -> Book:
+    return Book(
+        id=id,
+        title=f"Book{id}",
+        author=f"Author{id}",
+        description=f"Description{id}",
+        rating=rating,
+        published_year=published_year,
+    )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Every test gets its own store instead of the module-level seed data
+    repo = BookRepo([make_book(1, 5, 2001), make_book(2, 4, 2002), make_book(3, 5, 2003)])
+    monkeypatch.setattr(books, "BOOKS", repo)
+    monkeypatch.setattr(books, "_next_id", 4)
+    monkeypatch.setattr(books, "_all_books_json", None)
+    return TestClient(books.app)
+
+
+def new_book_json(**overrides) -> dict:
+    return {
+        "title": "New book",
+        "author": "New author",
+        "description": "A description",
+        "rating": 5,
+        "published_year": 2002,
+        **overrides,
+    }
+
+
+def ids(response) -> list[int]:
+    return [book["id"] for book in response.json()]
+
+
+def test_add_replace_remove_and_lookup(client):
+    assert client.post("/create_book/", json=new_book_json()).status_code == 201
+    assert client.get("/books/4").json()["title"] == "New book"
+    assert ids(client.get("/books/", params={"book_rating": 5})) == [1, 3, 4]
+
+    response = client.put("/books/update_book/", json=new_book_json(id=1, rating=2))
+    assert response.status_code == 204
+    assert ids(client.get("/books/", params={"book_rating": 5})) == [3, 4]
+    assert ids(client.get("/books/", params={"book_rating": 2})) == [1]
+    # Updating keeps the book's place in the listings
+    assert ids(client.get("/books/all_books")) == [1, 2, 3, 4]
+    assert ids(client.get("/books/year_filer/", params={"published_year": 2002})) == [1, 2, 4]
+
+    assert client.delete("/books/2").status_code == 204
+    assert client.get("/books/2").status_code == 404
+    assert ids(client.get("/books/all_books")) == [1, 3, 4]
+    # Books after the deleted one are still found through the id index
+    assert client.get("/books/3").json()["id"] == 3
+    assert client.get("/books/4").json()["id"] == 4
+    year_range = client.get("/books/year_range/", params={"year_from": 2000, "year_to": 2003})
+    assert ids(year_range) == [1, 4, 3]
+
+
+def test_missing_book_is_not_found(client):
+    assert client.put("/books/update_book/", json=new_book_json(id=99)).status_code == 404
+    assert client.delete("/books/99").status_code == 404
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_rating_range_on_large_repo(monkeypatch, use_numba):
+    pytest.importorskip("numpy")
+    if not use_numba:
+        monkeypatch.setattr(books, "_match_rating", None)
+    elif books._match_rating is None:
+        pytest.skip("numba is not installed")
+    repo = BookRepo([make_book(i, i % 5 + 1) for i in range(1, books._VECTORIZE_MIN_BOOKS + 201)])
+    repo.remove(3)
+    repo.replace(make_book(10, rating=1))
+
+    expected = [book for book in repo if 2 <= book.rating <= 3]
+    assert repo.rated_between(2, 3) == expected
+    assert [book.id for book in repo.with_rating(1)] == [book.id for book in repo if book.rating == 1]
+
+
+def test_inverted_range_is_rejected(client):
+    response = client.get("/books/rating_range/", params={"min_rating": 4, "max_rating": 2})
+    assert response.status_code == 422
+    response = client.get("/books/year_range/", params={"year_from": 2003, "year_to": 2001})
+    assert response.status_code == 422
+    # An equal lower and upper bound is still a valid range
+    assert ids(client.get("/books/rating_range/", params={"min_rating": 5, "max_rating": 5})) == [1, 3]
+
+
+def test_all_books_etag(client):
+    etag = client.get("/books/all_books").headers["etag"]
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}'):
+        response = client.get("/books/all_books", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+
+    client.delete("/books/1")
+    response = client.get("/books/all_books", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert ids(response) == [2, 3]